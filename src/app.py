@@ -5,7 +5,7 @@ A super simple FastAPI application that allows students to view and sign up
 for extracurricular activities at Mergington High School.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import RedirectResponse
 import os
@@ -19,80 +19,91 @@ current_dir = Path(__file__).parent
 app.mount("/static", StaticFiles(directory=os.path.join(Path(__file__).parent,
           "static")), name="static")
 
-# In-memory activity database
+# In-memory activity database. Participants are dicts keyed by email (values
+# unused): membership checks are O(1) and signup order is kept
 activities = {
     "Chess Club": {
         "description": "Learn strategies and compete in chess tournaments",
         "schedule": "Fridays, 3:30 PM - 5:00 PM",
         "max_participants": 12,
-        "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
+        "participants": dict.fromkeys(["michael@mergington.edu", "daniel@mergington.edu"])
     },
     "Programming Class": {
         "description": "Learn programming fundamentals and build software projects",
         "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
         "max_participants": 20,
-        "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
+        "participants": dict.fromkeys(["emma@mergington.edu", "sophia@mergington.edu"])
     },
     "Gym Class": {
         "description": "Physical education and sports activities",
         "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
         "max_participants": 30,
-        "participants": ["john@mergington.edu", "olivia@mergington.edu"]
+        "participants": dict.fromkeys(["john@mergington.edu", "olivia@mergington.edu"])
     },
     # Sports related activities
     "Soccer Team": {
         "description": "Join the school soccer team and compete in matches",
         "schedule": "Wednesdays, 4:00 PM - 5:30 PM",
         "max_participants": 22,
-        "participants": ["lucas@mergington.edu", "mia@mergington.edu"]
+        "participants": dict.fromkeys(["lucas@mergington.edu", "mia@mergington.edu"])
     },
     "Basketball Club": {
         "description": "Practice basketball skills and play friendly games",
         "schedule": "Thursdays, 3:30 PM - 5:00 PM",
         "max_participants": 15,
-        "participants": ["liam@mergington.edu", "ava@mergington.edu"]
+        "participants": dict.fromkeys(["liam@mergington.edu", "ava@mergington.edu"])
     },
     # Artistic activities
     "Art Workshop": {
         "description": "Explore painting, drawing, and sculpture techniques",
         "schedule": "Mondays, 4:00 PM - 5:30 PM",
         "max_participants": 18,
-        "participants": ["noah@mergington.edu", "isabella@mergington.edu"]
+        "participants": dict.fromkeys(["noah@mergington.edu", "isabella@mergington.edu"])
     },
     "Drama Club": {
         "description": "Act, direct, and produce school plays and performances",
         "schedule": "Fridays, 3:30 PM - 5:30 PM",
         "max_participants": 20,
-        "participants": ["ethan@mergington.edu", "charlotte@mergington.edu"]
+        "participants": dict.fromkeys(["ethan@mergington.edu", "charlotte@mergington.edu"])
     },
     # Intellectual activities
     "Math Olympiad": {
         "description": "Prepare for math competitions and solve challenging problems",
         "schedule": "Tuesdays, 4:00 PM - 5:00 PM",
         "max_participants": 16,
-        "participants": ["alex@mergington.edu", "grace@mergington.edu"]
+        "participants": dict.fromkeys(["alex@mergington.edu", "grace@mergington.edu"])
     },
     "Debate Team": {
         "description": "Develop public speaking and argumentation skills",
         "schedule": "Thursdays, 4:00 PM - 5:30 PM",
         "max_participants": 14,
-        "participants": ["henry@mergington.edu", "ella@mergington.edu"]
+        "participants": dict.fromkeys(["henry@mergington.edu", "ella@mergington.edu"])
     }
 }
 
 
+def get_activities_db():
+    """Provide the activity database to the endpoints (overridable in tests)"""
+    return activities
+
+
 @app.get("/")
 def root():
     return RedirectResponse(url="/static/index.html")
 
 
 @app.get("/activities")
-def get_activities():
-    return activities
+def get_activities(activities: dict = Depends(get_activities_db)):
+    # Participants are sent as a JSON list, in signup order
+    return {
+        name: {**details, "participants": list(details["participants"])}
+        for name, details in activities.items()
+    }
 
 
 @app.post("/activities/{activity_name}/signup")
-def signup_for_activity(activity_name: str, email: str):
+def signup_for_activity(activity_name: str, email: str,
+                        activities: dict = Depends(get_activities_db)):
     """Sign up a student for an activity"""
     # Validate activity exists
     if activity_name not in activities:
@@ -105,12 +116,13 @@ def signup_for_activity(activity_name: str, email: str):
     if email in activity["participants"]:
         raise HTTPException(status_code=400, detail="Student already signed up for this activity")
     # Add student
-    activity["participants"].append(email)
+    activity["participants"][email] = None
     return {"message": f"Signed up {email} for {activity_name}"}
 
 
 @app.delete("/activities/{activity_name}/unregister")
-def unregister_from_activity(activity_name: str, email: str):
+def unregister_from_activity(activity_name: str, email: str,
+                             activities: dict = Depends(get_activities_db)):
     """Unregister a student from an activity"""
     # Validate activity exists
     if activity_name not in activities:
@@ -124,5 +136,5 @@ def unregister_from_activity(activity_name: str, email: str):
         raise HTTPException(status_code=404, detail="Student not registered for this activity")
 
     # Remove student
-    activity["participants"].remove(email)
+    del activity["participants"][email]
     return {"message": f"Unregistered {email} from {activity_name}"}
@@ -0,0 +1,119 @@
+"""
+Shared fixtures for the Mergington High School Activities API tests
+
+Set PROFILE=1 to profile every request the tests make with pyinstrument and
+write one combined call tree to profile.html when the session ends
+(profile-<worker>.html under pytest-xdist). Requests are profiled on the
+event loop thread, and sync endpoints get their own profiler on the
+threadpool worker they run on, so the report shows both the request path
+and the handlers in src/app.py. pyinstrument is only needed when profiling:
+
+    pip install pyinstrument
+    PROFILE=1 pytest tests/test_api.py
+"""
+import functools
+import os
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi.routing import APIRoute
+from src.app import app
+
+PROFILE = os.environ.get("PROFILE") == "1"
+
+# Sampling intervals in seconds. Requests take around a millisecond and the
+# handlers in src/app.py a fraction of that, so both sample well below
+# pyinstrument's 1ms default
+_REQUEST_INTERVAL = 0.0002
+_ENDPOINT_INTERVAL = 0.00001
+
+# Profiler sessions recorded by _ProfilerMiddleware, one per request, and by
+# _profiled, one per endpoint call
+_profile_sessions = []
+_endpoint_sessions = []
+
+
+class _ProfilerMiddleware:
+    """ASGI middleware that records a pyinstrument session for each request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        from pyinstrument import Profiler
+
+        profiler = Profiler(interval=_REQUEST_INTERVAL, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _profile_sessions.append(profiler.stop())
+
+
+def _profiled(endpoint):
+    """Wrap a sync endpoint so it is profiled on the thread it runs on"""
+    from pyinstrument import Profiler
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        # FastAPI calls sync endpoints on a threadpool worker, which the
+        # request profiler on the event loop thread cannot sample
+        profiler = Profiler(interval=_ENDPOINT_INTERVAL, async_mode="disabled")
+        profiler.start()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            _endpoint_sessions.append(profiler.stop())
+
+    return wrapper
+
+
+if PROFILE:
+    # Middleware can only be added before the app handles its first request
+    app.add_middleware(_ProfilerMiddleware)
+
+
+@pytest.fixture(scope="session", autouse=PROFILE)
+def profile_report():
+    """Write the combined request profile once the session is done"""
+    # FastAPI reads route.dependant.call on every request (checked against
+    # FastAPI 0.143); setattr raises if that attribute ever goes away
+    with pytest.MonkeyPatch.context() as mp:
+        for route in app.routes:
+            if isinstance(route, APIRoute):
+                mp.setattr(route.dependant, "call", _profiled(route.dependant.call))
+        yield
+
+    if not _profile_sessions:
+        return
+    if not _endpoint_sessions:
+        raise RuntimeError(
+            "PROFILE=1 recorded requests but no endpoint calls; FastAPI no "
+            "longer calls route.dependant.call, so update _profiled"
+        )
+
+    from pyinstrument.renderers import HTMLRenderer
+    from pyinstrument.session import Session
+
+    sessions = _profile_sessions + _endpoint_sessions
+    combined = sessions[0]
+    for session in sessions[1:]:
+        combined = Session.combine(combined, session)
+
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    file_name = f"profile-{worker}.html" if worker else "profile.html"
+    with open(file_name, "w", encoding="utf-8") as profile_file:
+        profile_file.write(HTMLRenderer().render(combined))
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client():
+    """Async client shared by the whole session, calling the app in-process"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+        yield async_client
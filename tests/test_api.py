@@ -1,274 +1,273 @@
 """
 Tests for the Mergington High School Activities API
 """
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-from src.app import app, activities
-import copy
+from src.app import app, get_activities_db
 
-# Create test client
-client = TestClient(app)
+# Every test awaits the shared async client on the session event loop
+pytestmark = pytest.mark.asyncio
 
+# Seed data every test starts from
+_SEED_ACTIVITIES = {
+    "Chess Club": {
+        "description": "Learn strategies and compete in chess tournaments",
+        "schedule": "Fridays, 3:30 PM - 5:00 PM",
+        "max_participants": 12,
+        "participants": dict.fromkeys(["michael@mergington.edu", "daniel@mergington.edu"])
+    },
+    "Programming Class": {
+        "description": "Learn programming fundamentals and build software projects",
+        "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
+        "max_participants": 20,
+        "participants": dict.fromkeys(["emma@mergington.edu", "sophia@mergington.edu"])
+    },
+    "Gym Class": {
+        "description": "Physical education and sports activities",
+        "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
+        "max_participants": 30,
+        "participants": dict.fromkeys(["john@mergington.edu", "olivia@mergington.edu"])
+    }
+}
+
+
+# Expected decoded GET /activities body for the seed data; participants are
+# listed in signup order
+_EXPECTED_ACTIVITIES = {
+    name: {**details, "participants": list(details["participants"])}
+    for name, details in _SEED_ACTIVITIES.items()
+}
+
+
+# Endpoint paths reused across tests; emails are passed as query params
+_CHESS_SIGNUP = "/activities/Chess Club/signup"
+_CHESS_UNREGISTER = "/activities/Chess Club/unregister"
+_PROGRAMMING_SIGNUP = "/activities/Programming Class/signup"
+_PROGRAMMING_UNREGISTER = "/activities/Programming Class/unregister"
+
+
+def _json(response):
+    """Decode a JSON response body with orjson"""
+    return orjson.loads(response.content)
+
+
+def _copy_activities(source):
+    """Copy activities, giving each one its own participants dict"""
+    # Only the participants dicts are ever mutated, so a shallow copy of
+    # each activity is enough and much cheaper than copy.deepcopy
+    return {
+        name: {**details, "participants": dict(details["participants"])}
+        for name, details in source.items()
+    }
 
-@pytest.fixture(autouse=True)
-def reset_activities():
-    """Reset activities data before each test"""
-    global activities
-    # Store original activities
-    original_activities = copy.deepcopy(activities)
-    
-    # Reset to original state before each test
-    activities.clear()
-    activities.update({
-        "Chess Club": {
-            "description": "Learn strategies and compete in chess tournaments",
-            "schedule": "Fridays, 3:30 PM - 5:00 PM",
-            "max_participants": 12,
-            "participants": ["michael@mergington.edu", "daniel@mergington.edu"]
-        },
-        "Programming Class": {
-            "description": "Learn programming fundamentals and build software projects",
-            "schedule": "Tuesdays and Thursdays, 3:30 PM - 4:30 PM",
-            "max_participants": 20,
-            "participants": ["emma@mergington.edu", "sophia@mergington.edu"]
-        },
-        "Gym Class": {
-            "description": "Physical education and sports activities",
-            "schedule": "Mondays, Wednesdays, Fridays, 2:00 PM - 3:00 PM",
-            "max_participants": 30,
-            "participants": ["john@mergington.edu", "olivia@mergington.edu"]
-        }
-    })
-    
-    yield
-    
-    # Restore original activities after test
-    activities.clear()
-    activities.update(original_activities)
 
+@pytest.fixture(scope="session")
+def seeded_activities():
+    """Seed activities once for the whole session, for read-only tests"""
+    seeded = _copy_activities(_SEED_ACTIVITIES)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(app.dependency_overrides, get_activities_db, lambda: seeded)
+        yield seeded
 
+
+@pytest.fixture
+def activities(monkeypatch):
+    """Fresh copy of the seed activities for a test that mutates them"""
+    fresh = _copy_activities(_SEED_ACTIVITIES)
+    monkeypatch.setitem(app.dependency_overrides, get_activities_db, lambda: fresh)
+    return fresh
+
+
+@pytest.mark.usefixtures("seeded_activities")
 class TestActivitiesEndpoint:
-    """Test cases for GET /activities endpoint"""
+    """Test cases for GET /activities endpoint
     
-    def test_get_activities_success(self):
+    The endpoint has no response model; its contract is the plain dict shape
+    of the activities data, keyed by activity name.
+    """
+    
+    async def test_get_activities_success(self, client):
         """Test successful retrieval of all activities"""
-        response = client.get("/activities")
+        response = await client.get("/activities")
         
         assert response.status_code == 200
-        data = response.json()
+        assert response.headers["content-type"].startswith("application/json")
         
-        # Check that all expected activities are present
-        assert "Chess Club" in data
-        assert "Programming Class" in data
-        assert "Gym Class" in data
+        # The body is fully determined by the seed data
+        data = _json(response)
+        assert data == _EXPECTED_ACTIVITIES
         
         # Verify structure of activity data
         chess_club = data["Chess Club"]
-        assert "description" in chess_club
-        assert "schedule" in chess_club
-        assert "max_participants" in chess_club
-        assert "participants" in chess_club
-        
-        # Verify specific data
-        assert chess_club["max_participants"] == 12
-        assert len(chess_club["participants"]) == 2
-        assert "michael@mergington.edu" in chess_club["participants"]
-    
-    def test_get_activities_returns_json(self):
-        """Test that activities endpoint returns JSON format"""
-        response = client.get("/activities")
-        
-        assert response.status_code == 200
-        assert response.headers["content-type"] == "application/json"
+        assert set(chess_club) == {"description", "schedule", "max_participants", "participants"}
 
 
+@pytest.mark.usefixtures("activities")
 class TestSignupEndpoint:
     """Test cases for POST /activities/{activity_name}/signup endpoint"""
     
-    def test_signup_success(self):
-        """Test successful signup for an activity"""
-        response = client.post(
-            "/activities/Chess Club/signup?email=newstudent@mergington.edu"
-        )
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["message"] == "Signed up newstudent@mergington.edu for Chess Club"
-        
-        # Verify student was added to the activity
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert "newstudent@mergington.edu" in activities_data["Chess Club"]["participants"]
-    
-    def test_signup_activity_not_found(self):
-        """Test signup for non-existent activity"""
-        response = client.post(
-            "/activities/Non-existent Club/signup?email=student@mergington.edu"
-        )
-        
-        assert response.status_code == 404
-        data = response.json()
-        assert data["detail"] == "Activity not found"
-    
-    def test_signup_student_already_registered(self):
+    async def test_signup_student_already_registered(self, client):
         """Test signup when student is already registered"""
         # michael@mergington.edu is already in Chess Club
-        response = client.post(
-            "/activities/Chess Club/signup?email=michael@mergington.edu"
+        response = await client.post(
+            _CHESS_SIGNUP, params={"email": "michael@mergington.edu"}
         )
         
         assert response.status_code == 400
-        data = response.json()
+        data = _json(response)
         assert data["detail"] == "Student already signed up for this activity"
     
-    def test_signup_multiple_different_activities(self):
+    async def test_signup_multiple_different_activities(self, client, activities):
         """Test student can signup for multiple different activities"""
         email = "multistudent@mergington.edu"
         
         # Signup for Chess Club
-        response1 = client.post(f"/activities/Chess Club/signup?email={email}")
+        response1 = await client.post(_CHESS_SIGNUP, params={"email": email})
         assert response1.status_code == 200
         
         # Signup for Programming Class
-        response2 = client.post(f"/activities/Programming Class/signup?email={email}")
+        response2 = await client.post(_PROGRAMMING_SIGNUP, params={"email": email})
         assert response2.status_code == 200
         
         # Verify student is in both activities
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert email in activities_data["Chess Club"]["participants"]
-        assert email in activities_data["Programming Class"]["participants"]
-    
-    def test_signup_url_encoding(self):
-        """Test signup with URL-encoded activity names"""
-        # Test with spaces in activity name
-        response = client.post(
-            "/activities/Programming%20Class/signup?email=encoded@mergington.edu"
-        )
-        
-        assert response.status_code == 200
-        data = response.json()
-        assert data["message"] == "Signed up encoded@mergington.edu for Programming Class"
+        assert email in activities["Chess Club"]["participants"]
+        assert email in activities["Programming Class"]["participants"]
 
 
+@pytest.mark.usefixtures("activities")
 class TestUnregisterEndpoint:
     """Test cases for DELETE /activities/{activity_name}/unregister endpoint"""
     
-    def test_unregister_success(self):
-        """Test successful unregistration from an activity"""
+    async def test_unregister_success(self, client, activities):
+        """Test successful unregistration of a seeded participant"""
         # michael@mergington.edu is already in Chess Club
-        response = client.delete(
-            "/activities/Chess Club/unregister?email=michael@mergington.edu"
+        response = await client.delete(
+            _CHESS_UNREGISTER, params={"email": "michael@mergington.edu"}
         )
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert data["message"] == "Unregistered michael@mergington.edu from Chess Club"
         
         # Verify student was removed from the activity
-        activities_response = client.get("/activities")
-        activities_data = activities_response.json()
-        assert "michael@mergington.edu" not in activities_data["Chess Club"]["participants"]
+        assert "michael@mergington.edu" not in activities["Chess Club"]["participants"]
         # daniel should still be there
-        assert "daniel@mergington.edu" in activities_data["Chess Club"]["participants"]
-    
-    def test_unregister_activity_not_found(self):
-        """Test unregistration from non-existent activity"""
-        response = client.delete(
-            "/activities/Non-existent Club/unregister?email=student@mergington.edu"
-        )
-        
-        assert response.status_code == 404
-        data = response.json()
-        assert data["detail"] == "Activity not found"
+        assert "daniel@mergington.edu" in activities["Chess Club"]["participants"]
     
-    def test_unregister_student_not_registered(self):
+    async def test_unregister_student_not_registered(self, client):
         """Test unregistration when student is not registered"""
-        response = client.delete(
-            "/activities/Chess Club/unregister?email=notregistered@mergington.edu"
+        response = await client.delete(
+            _CHESS_UNREGISTER, params={"email": "notregistered@mergington.edu"}
         )
         
         assert response.status_code == 404
-        data = response.json()
+        data = _json(response)
         assert data["detail"] == "Student not registered for this activity"
     
-    def test_unregister_url_encoding(self):
+    async def test_unregister_url_encoding(self, client, activities):
         """Test unregistration with URL-encoded activity names and emails"""
-        # First signup the student
-        client.post("/activities/Programming%20Class/signup?email=test%2Buser@mergington.edu")
+        # Register the student in-process; only the DELETE has to decode the URL
+        activities["Programming Class"]["participants"]["test+user@mergington.edu"] = None
         
-        # Then unregister
-        response = client.delete(
+        response = await client.delete(
             "/activities/Programming%20Class/unregister?email=test%2Buser@mergington.edu"
         )
         
         assert response.status_code == 200
-        data = response.json()
+        data = _json(response)
         assert "test+user@mergington.edu" in data["message"]
 
 
+@pytest.mark.usefixtures("activities")
+class TestActivityNameHandling:
+    """Test cases for activity name lookup shared by signup and unregister"""
+    
+    @pytest.mark.parametrize("method,path,email,expected_status,expected_body", [
+        # Signup for non-existent activity
+        pytest.param(
+            "post", "/activities/Non-existent Club/signup", "student@mergington.edu",
+            404, {"detail": "Activity not found"},
+            id="signup-not-found"),
+        # Unregistration from non-existent activity
+        pytest.param(
+            "delete", "/activities/Non-existent Club/unregister", "student@mergington.edu",
+            404, {"detail": "Activity not found"},
+            id="unregister-not-found"),
+        # Signup with spaces URL-encoded in the activity name
+        pytest.param(
+            "post", "/activities/Programming%20Class/signup", "encoded@mergington.edu",
+            200, {"message": "Signed up encoded@mergington.edu for Programming Class"},
+            id="signup-url-encoded"),
+    ])
+    async def test_activity_name_lookup(self, client, method, path, email,
+                                        expected_status, expected_body):
+        """Test how signup and unregister resolve the activity name in the path"""
+        response = await getattr(client, method)(path, params={"email": email})
+        
+        assert response.status_code == expected_status
+        assert _json(response) == expected_body
+
+
+@pytest.mark.usefixtures("seeded_activities")
 class TestRootEndpoint:
     """Test cases for root endpoint"""
     
-    def test_root_redirect(self):
+    async def test_root_redirect(self, client):
         """Test that root endpoint redirects to static HTML"""
-        response = client.get("/", follow_redirects=False)
+        response = await client.get("/", follow_redirects=False)
         
         assert response.status_code == 307  # Temporary redirect
         assert response.headers["location"] == "/static/index.html"
 
 
+@pytest.mark.usefixtures("activities")
 class TestIntegrationScenarios:
     """Integration test scenarios"""
     
-    def test_complete_signup_and_unregister_flow(self):
+    @pytest.mark.parametrize("activity,signup_path,unregister_path,email", [
+        pytest.param("Chess Club", _CHESS_SIGNUP, _CHESS_UNREGISTER,
+                     "newstudent@mergington.edu", id="chess-club"),
+        pytest.param("Programming Class", _PROGRAMMING_SIGNUP, _PROGRAMMING_UNREGISTER,
+                     "integration@mergington.edu", id="programming-class"),
+    ])
+    async def test_signup_then_unregister_roundtrip(self, client, activities, activity,
+                                                    signup_path, unregister_path, email):
         """Test complete flow: signup -> verify -> unregister -> verify"""
-        email = "integration@mergington.edu"
-        activity = "Chess Club"
-        
-        # Initial state - student not registered
-        activities_response = client.get("/activities")
-        initial_data = activities_response.json()
-        assert email not in initial_data[activity]["participants"]
-        initial_count = len(initial_data[activity]["participants"])
+        initial_participants = list(activities[activity]["participants"])
+        assert email not in initial_participants
         
         # Step 1: Signup
-        signup_response = client.post(f"/activities/{activity}/signup?email={email}")
+        signup_response = await client.post(signup_path, params={"email": email})
         assert signup_response.status_code == 200
+        assert _json(signup_response)["message"] == f"Signed up {email} for {activity}"
         
         # Verify signup
-        activities_response = client.get("/activities")
-        after_signup_data = activities_response.json()
-        assert email in after_signup_data[activity]["participants"]
-        assert len(after_signup_data[activity]["participants"]) == initial_count + 1
+        assert list(activities[activity]["participants"]) == initial_participants + [email]
         
         # Step 2: Unregister
-        unregister_response = client.delete(f"/activities/{activity}/unregister?email={email}")
+        unregister_response = await client.delete(unregister_path, params={"email": email})
         assert unregister_response.status_code == 200
+        assert _json(unregister_response)["message"] == f"Unregistered {email} from {activity}"
         
-        # Verify unregistration
-        activities_response = client.get("/activities")
-        after_unregister_data = activities_response.json()
-        assert email not in after_unregister_data[activity]["participants"]
-        assert len(after_unregister_data[activity]["participants"]) == initial_count
+        # Verify unregistration left the other participants in place
+        assert list(activities[activity]["participants"]) == initial_participants
     
-    def test_prevent_double_signup_after_unregister(self):
+    async def test_prevent_double_signup_after_unregister(self, client):
         """Test that a student can't signup twice, even after unregistering and re-registering"""
         email = "double@mergington.edu"
-        activity = "Programming Class"
         
         # Signup
-        response1 = client.post(f"/activities/{activity}/signup?email={email}")
+        response1 = await client.post(_PROGRAMMING_SIGNUP, params={"email": email})
         assert response1.status_code == 200
         
         # Try to signup again (should fail)
-        response2 = client.post(f"/activities/{activity}/signup?email={email}")
+        response2 = await client.post(_PROGRAMMING_SIGNUP, params={"email": email})
         assert response2.status_code == 400
         
         # Unregister
-        response3 = client.delete(f"/activities/{activity}/unregister?email={email}")
+        response3 = await client.delete(_PROGRAMMING_UNREGISTER, params={"email": email})
         assert response3.status_code == 200
         
         # Signup again (should work)
-        response4 = client.post(f"/activities/{activity}/signup?email={email}")
+        response4 = await client.post(_PROGRAMMING_SIGNUP, params={"email": email})
         assert response4.status_code == 200
\ No newline at end of file